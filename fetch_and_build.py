@@ -1,31 +1,48 @@
 # -*- coding: utf-8 -*-
 """
 CIS Stundenplan Builder (06:00 Europe/Vienna)
-- Login per HTTP Basic (Playwright http_credentials)
-- Geht direkt zur Semesterpläne-Liste (1. Semester) und erkennt automatisch den dms.php?id=… Link
-- Lädt XLSX, parsed KW-Sheets, erstellt HTML & ICS
+- Schnellweg: bekannter dms.php?id=… Link direkt per HTTP (httpx, Basic Auth), ohne Browser
+- Sonst Login per HTTP Basic (Playwright http_credentials), direkt zur Semesterpläne-Liste
+  (1. Semester) und automatische Erkennung des dms.php?id=… Links
+- Lädt XLSX (bedingter GET per ETag/Last-Modified), parsed KW-Sheets, erstellt HTML & ICS
 - Fallback: fester Direktlink (falls die Liste temporär nicht erreichbar ist)
 """
-import os, re, math, time
+import os, re, math, hashlib, json, pickle
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import groupby
 from pathlib import Path
+from urllib.parse import urlsplit
+from zoneinfo import ZoneInfo
 import datetime as dt
 
-import pandas as pd
-from ics import Calendar, Event
-from pytz import timezone
+import httpx
+import numpy as np
+from python_calamine import CalamineWorkbook
 from jinja2 import Template
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import sync_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 
-TZ = timezone("Europe/Vienna")
+TZ = ZoneInfo("Europe/Vienna")
 BASE = Path(__file__).parent.resolve()
 PUBLIC = BASE / "public"
 PUBLIC.mkdir(exist_ok=True)
+CACHE = BASE / ".cache"   # bleibt zwischen Läufen erhalten (actions/cache), wird nicht veröffentlicht
+CACHE.mkdir(exist_ok=True)
 
 # ---- Konfiguration ----
 CIS_LOGIN_URL = "https://cis.miles.ac.at/cis/"
 # Diese URL ist (laut Logs/Screenshot) die Liste „Aktuelle Semesterpläne“ für euer 1. Semester
 SEMESTERPLAENE_LIST_URL = "https://cis.miles.ac.at/cms/news.php?studiengang_kz=888&semester=1"
 DOWNLOAD_XLSX_TO = BASE / "latest.xlsx"
+XLSX_META = CACHE / "xlsx.json"   # URL + ETag/Last-Modified des letzten Downloads
+EVENTS_CACHE_KEEP = 3   # geparste Events liegen als .cache/events-v<Format>-<blake2b der XLSX>.pkl, die neuesten 3 bleiben
+EVENTS_CACHE_FORMAT = 2   # erhöhen, wenn sich Event ändert (alte Pickles werden dann nicht mehr gelesen)
+# Chromium-Profil (launch_persistent_context) – bewusst NICHT unter .cache: es enthält die
+# CIS-Session-Cookies und darf nicht im actions/cache eines öffentlichen Repos landen
+BROWSER_PROFILE = BASE / ".pw-profile"
+# So lange wird ein per Browser gefundener Link direkt (ohne Browser) wiederverwendet
+LINK_MAX_AGE = dt.timedelta(days=7)
 
 # Falls die Liste mal nicht lädt / geändert wird: letzter bekannter Direktlink (leicht anpassbar)
 FALLBACK_XLSX_URL = os.environ.get(
@@ -33,220 +50,471 @@ FALLBACK_XLSX_URL = os.environ.get(
     "https://cis.miles.ac.at/cms/dms.php?id=848"
 )
 
+# Exportiertes Zeitfenster relativ zu heute
+WINDOW_PAST = dt.timedelta(days=7)
+WINDOW_FUTURE = dt.timedelta(days=120)
+# Vorlauf beim Parsen für den Events-Cache: das Fenster wandert täglich, der Cache deckt so ~4 Wochen ab
+EVENTS_CACHE_HEADROOM = dt.timedelta(weeks=4)
+
 # Suchmuster für den richtigen Eintrag
 NAME_RE = re.compile(r"1\.\s*Semester", re.I)
 IKTF_RE = re.compile(r"IKTF(\u00fc|ue)?", re.I)  # IKTFü/IKTFue/IKTF
 
+# Browser: nur HTML/JS wird gebraucht (Links auslesen), alles andere wird nicht geladen
+CHROMIUM_ARGS = ["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu", "--disable-extensions",
+                 "--disable-background-networking", "--blink-settings=imagesEnabled=false"]
+BLOCKED_RESOURCES = {"image", "font", "stylesheet", "media"}
+DMS_LINK_SELECTOR = "a[href*='dms.php?id=']"
+
+# Muster für das Parsen der KW-Sheets (einmal kompiliert, laufen pro Zelle)
+TIME_RE = re.compile(r"^(\d{1,2}):(\d{2})$")
+WEEKDAY_RE = re.compile(r"^(Montag|Dienstag|Mittwoch|Donnerstag|Freitag|Samstag|Sonntag)$", re.I)
+DATE_RE = re.compile(r"(\d{1,2})[.\s](\d{1,2})[.\s](\d{4})")
+SPLIT_RE = re.compile(r"\s*\|\s*|\n")
+
+SLOT_TAIL = dt.timedelta(minutes=5)   # letzte Rasterzeile = Beginn des letzten 5-Minuten-Slots
+
+# Lesebereich pro KW-Sheet: Kopf (Wochentage + Datum darunter) und Zeitraster
+HEADER_ROWS = 30
+SHEET_MAX_ROWS = 300   # deutlich mehr als jedes reale Zeitraster
+
 
 # --------------------- Login + automatische Link-Erkennung --------------------- #
 
-def fetch_latest_xlsx_via_browser():
-    user = os.environ["CIS_USER"]
-    pw   = os.environ["CIS_PASS"]
+def fetch_latest_xlsx() -> bool:
+    """Holt die XLSX; True, wenn eine neue Version geladen wurde."""
+    meta = _load_xlsx_meta()
+    resolved = meta.get("resolved")
+    if meta.get("url") and resolved and dt.date.today() - dt.date.fromisoformat(resolved) <= LINK_MAX_AGE:
+        changed = _download_xlsx(meta["url"], resolved)
+        if changed is not None:
+            return changed
+        print("[WARN] Direktabruf ohne Erfolg – suche Link per Browser.")
+    return fetch_xlsx_via_browser()
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            accept_downloads=True,
-            http_credentials={"username": user, "password": pw}
-        )
-        page = context.new_page()
 
-        # 1) Login (HTTP Basic)
-        page.goto(CIS_LOGIN_URL, wait_until="domcontentloaded")
+@lru_cache(maxsize=None)
+def _http() -> httpx.Client:
+    """Ein Client (Keep-Alive, Basic Auth) für alle Abrufe, die keinen Browser brauchen.
+    dms.php leitet gern per 30x auf die eigentliche Datei weiter – wie im Browser folgen."""
+    return httpx.Client(auth=(os.environ["CIS_USER"], os.environ["CIS_PASS"]), timeout=30,
+                        follow_redirects=True, limits=httpx.Limits(max_keepalive_connections=8))
 
-        # 2) Direkt auf die Semesterpläne-Liste (vermeidet Frame-Navigation)
-        page.goto(SEMESTERPLAENE_LIST_URL, wait_until="domcontentloaded")
-        time.sleep(0.6)
 
-        # 3) Kandidaten sammeln: bevorzugt dms.php?id=… Links
-        links = page.locator("a[href*='dms.php?id=']")
-        n = links.count()
-        print(f"[DEBUG] Liste geladen, dms-Links gefunden: {n}")
+def fetch_xlsx_via_browser() -> bool:
+    """Link per Browser finden und laden – per httpx mit den Session-Cookies, notfalls im Browser."""
+    user = os.environ["CIS_USER"]
+    pw   = os.environ["CIS_PASS"]
 
-        target = None
+    with sync_playwright() as p:
+        # Persistentes Profil: HTTP-Cache, Cookies und HSTS bleiben zwischen den Läufen erhalten
+        context = p.chromium.launch_persistent_context(
+            user_data_dir=str(BROWSER_PROFILE), headless=True, args=CHROMIUM_ARGS,
+            http_credentials={"username": user, "password": pw},
+        )
+        context.route("**/*", lambda route: route.abort()
+                      if route.request.resource_type in BLOCKED_RESOURCES else route.continue_())
+        context.set_default_navigation_timeout(15000)   # lieber schnell scheitern als hängen
+        page = context.pages[0] if context.pages else context.new_page()
+
+        # 1) Direkt auf die Semesterpläne-Liste (vermeidet Frame-Navigation); HTTP Basic beantwortet
+        #    Playwright selbst. Erst über den Login, wenn wir nicht auf der Liste landen oder sie
+        #    keine dms-Links zeigt (Seite ohne gültige Session).
+        def open_list() -> bool:
+            resp = page.goto(SEMESTERPLAENE_LIST_URL, wait_until="domcontentloaded")
+            if resp is None or not resp.ok or urlsplit(page.url).path != urlsplit(SEMESTERPLAENE_LIST_URL).path:
+                return False
+            # Warten, bis der erste dms-Link im DOM ist (statt auf networkidle)
+            try: page.wait_for_selector(DMS_LINK_SELECTOR, state="attached", timeout=5000)
+            except PlaywrightTimeoutError: return False
+            return True
+
+        if not open_list():
+            print("[DEBUG] Liste nicht direkt erreichbar / ohne dms-Links – Login über CIS-Startseite.")
+            page.goto(CIS_LOGIN_URL, wait_until="domcontentloaded")
+            if not open_list():
+                print("[WARN] Auch nach dem Login keine dms-Links auf der Liste.")
+
+        # 2) Alle Links in einem Aufruf auslesen (statt Round-Trip pro Link): Text, href und ein
+        #    dms.php?id=…-Link im Umfeld (Eltern, Großeltern, Tabellenzeile) – manchmal ist das
+        #    Excel-Icon ein separater Link neben dem Text
+        links = page.locator("a").evaluate_all("""(els, sel) => els.map(e => {
+            const row = e.parentElement, row2 = row && row.parentElement, tr = e.closest("tr");
+            const dms = (row && row.querySelector(sel)) || (row2 && row2.querySelector(sel))
+                        || (tr && tr.querySelector(sel));
+            return {href: e.href, text: e.innerText, dms: dms ? dms.href : null};
+        })""", DMS_LINK_SELECTOR)
+        dms_links = [link for link in links if "dms.php?id=" in link["href"]]
+        print(f"[DEBUG] Liste geladen, dms-Links gefunden: {len(dms_links)}")
+
+        url = None
         best_txt = ""
         # A) suche Link, dessen Text sowohl „1. Semester“ als auch „IKTF(ü)“ enthält
-        for i in range(n):
-            el = links.nth(i)
-            txt = (el.inner_text() or "").strip()
+        for link in dms_links:
+            txt = (link["text"] or "").strip()
             if NAME_RE.search(txt) and IKTF_RE.search(txt):
-                target = el
-                best_txt = txt
+                url, best_txt = link["href"], txt
                 break
 
         # B) Falls A nicht klappt: wähle den ersten dms-Link in Nähe eines Texts der passt
-        if not target:
-            # Scanne alle <a> (auch ohne dms) – manchmal ist das Excel-Icon ein separater Link
-            all_a = page.locator("a")
-            m = all_a.count()
-            print(f"[DEBUG] Fallback-Scan aller Links: {m}")
-            for i in range(min(500, m)):
-                try:
-                    el = all_a.nth(i)
-                    txt = (el.inner_text() or "").strip()
-                    if NAME_RE.search(txt) and IKTF_RE.search(txt):
-                        # suche in Eltern/Umfeld ein dms.php?id=…-Link (Icon)
-                        row = el.locator("xpath=..")
-                        dms = row.locator("a[href*='dms.php?id=']")
-                        if dms.count() == 0:
-                            row2 = row.locator("xpath=..")
-                            dms = row2.locator("a[href*='dms.php?id=']")
-                        if dms.count() > 0:
-                            target = dms.first
-                            best_txt = txt
-                            break
-                except Exception:
-                    pass
+        if not url:
+            print(f"[DEBUG] Fallback-Scan aller Links: {len(links)}")
+            for link in links[:500]:
+                txt = (link["text"] or "").strip()
+                if link["dms"] and NAME_RE.search(txt) and IKTF_RE.search(txt):
+                    url, best_txt = link["dms"], txt
+                    break
 
         # C) Ultimativer Fallback: fester Direktlink
-        if not target:
+        if not url:
             print("[WARN] Kein dms-Link per Heuristik gefunden – nutze Fallback-ID.")
-            with page.expect_download() as dl:
-                page.goto(FALLBACK_XLSX_URL, wait_until="domcontentloaded")
-            dl.value.save_as(str(DOWNLOAD_XLSX_TO))
+            url = FALLBACK_XLSX_URL
         else:
-            print(f"[DEBUG] Klicke Download: '{best_txt}'")
-            with page.expect_download() as dl:
-                target.click()
-            dl.value.save_as(str(DOWNLOAD_XLSX_TO))
+            print(f"[DEBUG] Gefunden: '{best_txt}'")
+
+        # Nur echte Treffer der Link-Erkennung werden im Schnellweg wiederverwendet
+        resolved = dt.date.today().isoformat() if url != FALLBACK_XLSX_URL else None
+
+        # Session-Cookies des Browsers für den Download per httpx übernehmen
+        for ck in context.cookies():
+            _http().cookies.set(ck["name"], ck["value"], domain=ck["domain"], path=ck["path"])
+        changed = _download_xlsx(url, resolved)
+        if changed is None:   # httpx abgelehnt -> dieselbe Datei über die offene Browser-Session
+            print("[WARN] Download per httpx fehlgeschlagen – lade über den Browser.")
+            changed = _download_xlsx_via_page(page, url, resolved)
 
         context.close()
-        browser.close()
+    return changed
+
+
+def _download_xlsx_via_page(page, url: str, resolved: str | None) -> bool:
+    part = DOWNLOAD_XLSX_TO.with_suffix(".part")
+    with page.expect_download() as dl:
+        try: page.goto(url)
+        except PlaywrightError: pass   # Chromium bricht die Navigation ab, sobald der Download startet
+    dl.value.save_as(str(part))
+    h = _xlsx_hasher()
+    h.update(part.read_bytes())
+    part.replace(DOWNLOAD_XLSX_TO)
+    _store_xlsx_meta(url, {}, resolved, h.hexdigest())   # ohne ETag/Last-Modified -> nächster Abruf unbedingt
+    return True
+
+
+def _load_xlsx_meta() -> dict:
+    try: return json.loads(XLSX_META.read_text(encoding="utf-8"))
+    except (OSError, ValueError): return {}
+
+
+def _conditional_headers(url: str) -> dict:
+    meta = _load_xlsx_meta()
+    headers = {}
+    if DOWNLOAD_XLSX_TO.exists() and meta.get("url") == url:
+        if meta.get("etag"): headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"): headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def _xlsx_hasher():
+    """Inhalts-Hash der XLSX (Schlüssel des Events-Caches)."""
+    return hashlib.blake2b(digest_size=16)
+
+
+def _store_xlsx_meta(url: str, headers, resolved: str | None, digest: str):
+    XLSX_META.write_text(json.dumps({
+        "url": url, "resolved": resolved, "blake2b": digest,
+        "etag": headers.get("etag"), "last_modified": headers.get("last-modified"),
+    }), encoding="utf-8")
+
+
+def _download_xlsx(url: str, resolved: str | None) -> bool | None:
+    """Bedingter GET nach DOWNLOAD_XLSX_TO; False bei 304, None wenn keine XLSX kommt (Login-Seite, Fehler)."""
+    part = DOWNLOAD_XLSX_TO.with_suffix(".part")
+    try:
+        with _http().stream("GET", url, headers=_conditional_headers(url)) as r:
+            if r.status_code == 304:
+                print("[DEBUG] XLSX unverändert (304) – nutze vorhandene Datei.")
+                # Link frisch per Browser bestätigt -> Datum erneuern, sonst bleibt der Schnellweg
+                # nach LINK_MAX_AGE aus, bis sich die Datei ändert (ETag/Hash bleiben gültig)
+                meta = _load_xlsx_meta()
+                if resolved and meta.get("resolved") != resolved:
+                    XLSX_META.write_text(json.dumps({**meta, "resolved": resolved}), encoding="utf-8")
+                return False
+            chunks = r.iter_bytes(64 * 1024)
+            h = _xlsx_hasher()
+            first = next(chunks, b"") if r.is_success else b""
+            if not first.startswith(b"PK"):   # XLSX = ZIP
+                print(f"[WARN] Keine XLSX unter {url} -> {r.url} "
+                      f"(HTTP {r.status_code}, {r.headers.get('content-type')})")
+                return None
+            with part.open("wb") as f:
+                f.write(first)
+                h.update(first)
+                for chunk in chunks:
+                    f.write(chunk)
+                    h.update(chunk)
+    except httpx.HTTPError as e:
+        print(f"[WARN] Abruf von {url} fehlgeschlagen: {e}")
+        part.unlink(missing_ok=True)
+        return None
+    part.replace(DOWNLOAD_XLSX_TO)
+    _store_xlsx_meta(url, r.headers, resolved, h.hexdigest())
+    return True
 
 
 # --------------------- XLSX -> Events --------------------- #
 
-def list_kw_sheets(xls: pd.ExcelFile):
+@dataclass(slots=True, frozen=True)
+class Event:
+    title: str
+    lecturer: str
+    room: str
+    start: dt.datetime   # aware (Europe/Vienna)
+    end: dt.datetime
+
+
+def list_kw_sheets(sheet_names: list[str], weeks: set[int] | None = None):
     kws = []
-    for s in xls.sheet_names:
-        if re.fullmatch(r"\d{2}", str(s)) or re.fullmatch(r"\d{2}", str(s).zfill(2)):
-            kws.append(s)
-        elif re.fullmatch(r"\d{2}", str(s)[-2:]):
-            kws.append(s)
-    def keyf(k):
-        try: return int(str(k)[-2:])
-        except: return 999
-    return sorted(kws, key=keyf)
+    for s in sheet_names:
+        tail = str(s).zfill(2)[-2:]   # "KW 07", "07", "7" -> "07"
+        if not tail.isdecimal(): continue   # isdecimal statt Regex; "KW 7", "Info" etc. fallen raus
+        kw = int(tail)
+        if weeks is None or kw in weeks:
+            kws.append((kw, s))
+    return [s for _, s in sorted(kws, key=lambda k: k[0])]
 
 
 def try_parse_time(cell) -> dt.time | None:
+    if type(cell) is str: return _parse_time_str(cell)   # häufigster Fall zuerst
     if cell is None or (isinstance(cell, float) and math.isnan(cell)): return None
     if isinstance(cell, dt.time): return cell
     if isinstance(cell, dt.datetime): return dt.time(cell.hour, cell.minute)
-    s = str(cell).strip()
-    m = re.match(r"^(\d{1,2}):(\d{2})$", s)
+    return _parse_time_str(str(cell))
+
+
+@lru_cache(maxsize=4096)
+def _parse_time_str(s: str) -> dt.time | None:
+    # Zeitspalten wiederholen dieselben Werte ("08:00", "08:45", …) in jedem Sheet
+    m = TIME_RE.match(s.strip())
     if m:
         hh, mm = int(m.group(1)), int(m.group(2))
         if 0 <= hh < 24 and 0 <= mm < 60: return dt.time(hh, mm)
     return None
 
 
-def extract_dates_from_header(df):
-    weekday_re = re.compile(r"^(Montag|Dienstag|Mittwoch|Donnerstag|Freitag|Samstag|Sonntag)$", re.I)
-    date_re = re.compile(r"(\d{1,2})[.\s](\d{1,2})[.\s](\d{4})")
+_parse_times = np.frompyfunc(try_parse_time, 1, 1)   # elementweise über ein object-Array
+
+
+def _cell_text(v) -> str:
+    # leere Zellen kommen als "" (calamine) bzw. None/NaN; ganzzahlige Floats wie 101.0 -> "101"
+    if type(v) is str: return v.strip()
+    if v is None: return ""
+    if isinstance(v, float):
+        if math.isnan(v): return ""
+        if v.is_integer(): return str(int(v))
+    return str(v).strip()
+
+
+def extract_dates_from_header(arr):
     col_date = {}
-    for r in range(0, min(30, len(df))):
-        for c in range(0, df.shape[1]):
-            val = str(df.iat[r, c]).strip()
-            if weekday_re.match(val):
-                for look in range(1, 5):
-                    rr = r + look
-                    if rr >= len(df): break
-                    s2 = str(df.iat[rr, c]).strip()
-                    m = date_re.search(s2)
-                    if m:
-                        d, mo, y = int(m.group(1)), int(m.group(2)), int(m.group(3))
-                        try: col_date[c] = dt.date(y, mo, d)
-                        except: pass
-                        break
+    nrows, ncols = arr.shape
+    for r in range(0, min(HEADER_ROWS, nrows)):
+        for c in range(0, ncols):
+            # Wochentag und Datum stehen als Text im Kopf; Zahlen/leere Zellen gar nicht erst str()-en
+            val = arr[r, c]
+            if type(val) is not str or not WEEKDAY_RE.match(val.strip()): continue
+            for look in range(1, 5):
+                rr = r + look
+                if rr >= nrows: break
+                s2 = arr[rr, c]
+                m = DATE_RE.search(s2) if type(s2) is str else None
+                if m:
+                    d, mo, y = int(m.group(1)), int(m.group(2)), int(m.group(3))
+                    try: col_date[c] = dt.date(y, mo, d)
+                    except: pass
+                    break
     return col_date
 
 
-def parse_xlsx_to_events(xlsx: Path):
-    xls = pd.ExcelFile(xlsx)
-    events = []
-    for sheet in list_kw_sheets(xls):
-        df = pd.read_excel(xls, sheet_name=sheet, header=None)
-        if df.empty: continue
-
-        # 1) Zeitspalte
-        time_col = None
-        for c in range(min(5, df.shape[1])):
-            got = sum(1 for r in range(min(200, len(df))) if try_parse_time(df.iat[r, c]))
-            if got > 5:
-                time_col = c; break
-        if time_col is None: continue
-
-        # 2) Datumsspalten (Tage)
-        col_dates = extract_dates_from_header(df)
-        day_cols = sorted(col_dates.keys())
-        if not day_cols: continue
-
-        # 3) Start der Zeitraster
-        start_row = None
-        for r in range(len(df)):
-            if try_parse_time(df.iat[r, time_col]):
-                cnt = sum(1 for k in range(r, min(r+10, len(df))) if try_parse_time(df.iat[k, time_col]))
-                if cnt >= 3: start_row = r; break
-        if start_row is None: continue
-
-        # 4) Slots -> Events
+def calendar_weeks(first: dt.date, last: dt.date) -> set[int]:
+    """ISO-Kalenderwochen, die der Zeitraum [first, last] berührt (auch über den Jahreswechsel)."""
+    return {(first + dt.timedelta(days=i)).isocalendar().week for i in range((last - first).days + 1)}
+
+
+def _parse_sheet(rows: list, date_window: tuple[dt.date, dt.date] | None) -> list[tuple]:
+    """Ein KW-Sheet (Rohzeilen) -> (title, lecturer, room, start, end) in Event-Feldreihenfolge;
+    hängt von keinem anderen Sheet ab."""
+    # Rohwerte statt DataFrame: die Zellen werden ohnehin einzeln gelesen
+    if not rows: return []
+    arr = np.array(rows, dtype=object)
+    if arr.ndim != 2: return []
+
+    col_dates = extract_dates_from_header(arr)
+    day_cols = sorted(c for c, d in col_dates.items()
+                      if date_window is None or date_window[0] <= d <= date_window[1])
+    if not day_cols: return []
+    # Rechts der letzten Tagesspalte steht nichts, was gebraucht wird (Spaltenindizes bleiben gleich)
+    arr = arr[:, :max(5, day_cols[-1] + 1)]
+    nrows, ncols = arr.shape
+
+    # 1) Zeitspalte: die ersten 5 Spalten einmal parsen, daraus Maske, Spalte und Rasterstart
+    parsed = _parse_times(arr[:, :5])
+    is_time = parsed.astype(bool)
+    hits = np.flatnonzero(is_time[:200].sum(axis=0) > 5)
+    if not hits.size: return []
+    time_col = int(hits[0])
+    mask = is_time[:, time_col]
+    times = parsed[:, time_col].tolist()
+    cell_strs = {c: [_cell_text(v) for v in arr[:, c]] for c in day_cols}
+
+    # 2) Start der Zeitraster: erste Zeitzeile mit >=3 Zeiten in den nächsten 10 Zeilen
+    csum = np.concatenate(([0], np.cumsum(mask)))
+    idx = np.arange(nrows)
+    cand = np.flatnonzero(mask & (csum[np.minimum(idx + 10, nrows)] - csum[idx] >= 3))
+    if not cand.size: return []
+    start_row = int(cand[0])
+
+    # 3) Slots -> Events: pro Tagesspalte ein Durchlauf, gleiche Folgezellen = ein Termin
+    out = []
+    combine, split = dt.datetime.combine, SPLIT_RE.split   # lokal gebunden für die innere Schleife
+    for c in day_cols:
+        col = cell_strs[c]
+        day = col_dates[c]
         r = start_row
-        while r < len(df):
-            t = try_parse_time(df.iat[r, time_col])
-            if not t:
+        while r < nrows:
+            cell = col[r]
+            if not times[r] or not cell:
                 r += 1
                 continue
-            start_time = t
-            for c in day_cols:
-                cell = str(df.iat[r, c]).strip()
-                if not cell or cell.lower() == "nan":
-                    continue
-                rr = r + 1
-                while rr < len(df):
-                    t2 = try_parse_time(df.iat[rr, time_col])
-                    if not t2: break
-                    if str(df.iat[rr, c]).strip() != cell: break
-                    rr += 1
-                end_time = try_parse_time(df.iat[rr-1, time_col])
-                end_dt = dt.datetime.combine(col_dates[c], end_time) + dt.timedelta(minutes=5)
-                start_dt = dt.datetime.combine(col_dates[c], start_time)
-                title, lecturer, room = cell, "", ""
-                parts = [p.strip() for p in re.split(r"\s*\|\s*|\n", cell) if p.strip()]
-                if len(parts)>=1: title = parts[0]
-                if len(parts)>=2: lecturer = parts[1]
-                if len(parts)>=3: room = parts[2]
-                events.append({
-                    "title": title, "lecturer": lecturer, "room": room,
-                    "start": TZ.localize(start_dt), "end": TZ.localize(end_dt)
-                })
-            r += 1
-
-    # Duplikate raus
-    events = [e for e in events if e["end"] > e["start"]]
-    uniq = {(e["title"], e["lecturer"], e["room"], e["start"], e["end"]): e for e in events}
-    return list(uniq.values())
+            rr = r + 1
+            while rr < nrows and times[rr] and col[rr] == cell:
+                rr += 1
+            start_time, end_time = times[r], times[rr-1]
+            # Wanduhrzeit aus Excel -> direkt mit tzinfo bauen (zoneinfo, kein localize nötig)
+            end_dt = combine(day, end_time, tzinfo=TZ) + SLOT_TAIL
+            start_dt = combine(day, start_time, tzinfo=TZ)
+            r = rr
+            if end_dt <= start_dt: continue
+            title, lecturer, room = cell, "", ""
+            parts = [p.strip() for p in split(cell) if p.strip()]
+            if len(parts)>=1: title = parts[0]
+            if len(parts)>=2: lecturer = parts[1]
+            if len(parts)>=3: room = parts[2]
+            out.append((title, lecturer, room, start_dt, end_dt))
+    return out
+
+
+def parse_xlsx_to_events(xlsx: Path, date_window: tuple[dt.date, dt.date] | None = None):
+    """date_window: nur KW-Sheets/Tagesspalten in [von, bis] parsen (None = alle)."""
+    weeks = calendar_weeks(*date_window) if date_window else None
+    with CalamineWorkbook.from_path(str(xlsx)) as wb:
+        sheets = [wb.get_sheet_by_name(name).to_python(skip_empty_area=False, nrows=SHEET_MAX_ROWS)
+                  for name in list_kw_sheets(wb.sheet_names, weeks)]
+
+    events = []
+    seen = set()   # Duplikate (gleicher Termin in mehreren Sheets/Zellen) nur einmal übernehmen
+    for rows in sheets:
+        for key in _parse_sheet(rows, date_window):
+            if key in seen: continue
+            seen.add(key)
+            events.append(Event(*key))
+    return events
+
+
+def load_events(xlsx: Path, date_window: tuple[dt.date, dt.date], digest: str | None = None):
+    """Wie parse_xlsx_to_events, aber aus dem Cache, solange es zum Inhalt der XLSX (BLAKE2b)
+    einen Eintrag gibt, der den gewünschten Zeitraum abdeckt. digest: bereits bekannter Hash
+    (aus xlsx.json), sonst wird die Datei gehasht."""
+    if digest is None:
+        h = _xlsx_hasher()
+        h.update(xlsx.read_bytes())
+        digest = h.hexdigest()
+    path = CACHE / f"events-v{EVENTS_CACHE_FORMAT}-{digest}.pkl"
+    try:
+        cached = pickle.loads(path.read_bytes())
+        lo, hi = cached["window"]
+        if lo <= date_window[0] and date_window[1] <= hi:
+            print("[DEBUG] XLSX unverändert – Events aus dem Cache.")
+            path.touch()   # zählt beim Aufräumen als zuletzt benutzt
+            return cached["events"]
+    except Exception:
+        pass   # kein/alter/kaputter Cache -> neu parsen
+    # Mit Vorlauf parsen, damit die Läufe der nächsten Tage (Fenster +1 Tag) noch Treffer sind
+    date_window = (date_window[0], date_window[1] + EVENTS_CACHE_HEADROOM)
+    events = parse_xlsx_to_events(xlsx, date_window)
+    with _atomic_open(path) as f:
+        pickle.dump({"window": date_window, "events": events}, f, protocol=5)
+    old = sorted(CACHE.glob("events-*.pkl"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in old[EVENTS_CACHE_KEEP:]:
+        stale.unlink(missing_ok=True)
+    return events
 
 
 # --------------------- Exporte --------------------- #
 
+@contextmanager
+def _atomic_open(path: Path):
+    """Schreibt in path.tmp und ersetzt path erst am Ende (os.replace) – Leser sehen nie eine halbe Datei."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    try:
+        with tmp.open("wb") as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+_ICS_ESCAPE = str.maketrans({"\\": "\\\\", ";": "\\;", ",": "\\,", "\n": "\\n"})
+
+
+def _ics_escape(s: str) -> str:
+    return s.translate(_ICS_ESCAPE)
+
+
+def _ics_fold(line: str) -> str:
+    # RFC 5545 3.1: Zeilen > 75 Oktette umbrechen, Fortsetzung beginnt mit Leerzeichen
+    if len(line.encode("utf-8")) <= 75: return line
+    out, cur, size = [], "", 0
+    for ch in line:
+        n = len(ch.encode("utf-8"))
+        if size + n > 75:
+            out.append(cur); cur, size = " ", 1
+        cur += ch; size += n
+    out.append(cur)
+    return "\r\n".join(out)
+
+
+def _ics_utc(d: dt.datetime) -> str:
+    return d.astimezone(dt.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
 def build_ics(events):
-    cal = Calendar()
+    stamp = _ics_utc(dt.datetime.now(dt.timezone.utc))
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//stundenplan//DE"]
     for e in events:
-        ev = Event()
-        ev.name = e["title"]; ev.begin = e["start"]; ev.end = e["end"]
+        key = "|".join((e.title, e.lecturer, e.room, e.start.isoformat(), e.end.isoformat()))
+        uid = hashlib.sha1(key.encode("utf-8")).hexdigest()
         desc = []
-        if e["lecturer"]: desc.append(f"Dozent: {e['lecturer']}")
-        if e["room"]: desc.append(f"Raum: {e['room']}")
-        ev.description = "\n".join(desc) if desc else ""
-        ev.location = e["room"] or ""
-        cal.events.add(ev)
-    (PUBLIC / "stundenplan.ics").write_text(str(cal), encoding="utf-8")
-
-
-def build_html(events):
-    tmpl = Template("""
+        if e.lecturer: desc.append(f"Dozent: {e.lecturer}")
+        if e.room: desc.append(f"Raum: {e.room}")
+        desc = "\n".join(desc)
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{uid}@stundenplan",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{_ics_utc(e.start)}",
+            f"DTEND:{_ics_utc(e.end)}",
+            _ics_fold(f"SUMMARY:{_ics_escape(e.title)}"),
+        ]
+        if e.room: lines.append(_ics_fold(f"LOCATION:{_ics_escape(e.room)}"))
+        if desc: lines.append(_ics_fold(f"DESCRIPTION:{_ics_escape(desc)}"))
+        lines.append("END:VEVENT")
+    lines += ["END:VCALENDAR", ""]   # "" -> abschließendes CRLF
+    with _atomic_open(PUBLIC / "stundenplan.ics") as f:
+        f.write(b"\r\n".join(line.encode("utf-8") for line in lines))
+
+
+_HTML_TMPL = Template("""
 <!doctype html>
 <meta name="viewport" content="width=device-width, initial-scale=1">
 <title>Stundenplan</title>
@@ -266,34 +534,38 @@ def build_html(events):
 <div>Automatisch aktualisiert täglich 06:00 (Europe/Vienna).</div>
 {% for day, items in days %}
   <div class="day">
-    <div class="t">{{ day.strftime("%A, %d.%m.%Y") }}</div>
+    <div class="t">{{ day }}</div>
     {% for e in items %}
       <div class="ev">
         <div class="t">{{ e.title }}</div>
-        <div class="sub">{{ e.start.strftime("%H:%M") }}–{{ e.end.strftime("%H:%M") }}{% if e.room %} | {{ e.room }}{% endif %}{% if e.lecturer %} | {{ e.lecturer }}{% endif %}</div>
+        <div class="sub">{{ e.s }}–{{ e.e }}{% if e.room %} | {{ e.room }}{% endif %}{% if e.lecturer %} | {{ e.lecturer }}{% endif %}</div>
       </div>
     {% endfor %}
   </div>
 {% endfor %}
 """)
-    by_day = {}
-    for e in events:
-        d = e["start"].date()
-        by_day.setdefault(d, []).append(e)
-    days = []
-    for d, items in by_day.items():
-        items.sort(key=lambda x: x["start"])
-        days.append((d, items))
-    days.sort(key=lambda x: x[0])
-    html = tmpl.render(days=days)
-    (PUBLIC / "index.html").write_text(html, encoding="utf-8")
+
+
+def build_html(events):
+    events_sorted = sorted(events, key=lambda e: e.start)
+    # strftime einmal pro Termin/Tag hier statt im Render-Loop von Jinja
+    days = [(d.strftime("%A, %d.%m.%Y"),
+             [{"title": e.title, "room": e.room, "lecturer": e.lecturer,
+               "s": e.start.strftime("%H:%M"), "e": e.end.strftime("%H:%M")} for e in items])
+            for d, items in groupby(events_sorted, key=lambda e: e.start.date())]
+    with _atomic_open(PUBLIC / "index.html") as f:
+        _HTML_TMPL.stream(days=days).dump(f, encoding="utf-8")
 
 
 def main():
-    fetch_latest_xlsx_via_browser()
-    events = parse_xlsx_to_events(DOWNLOAD_XLSX_TO)
-    now = TZ.localize(dt.datetime.now())
-    events = [e for e in events if (e["end"] >= now - dt.timedelta(days=7) and e["start"] <= now + dt.timedelta(days=120))]
+    changed = fetch_latest_xlsx()
+    # Unverändert (304): der Hash steht schon in xlsx.json, die Datei muss nicht neu gelesen werden
+    digest = None if changed else _load_xlsx_meta().get("blake2b")
+    now = dt.datetime.now(TZ)
+    lo, hi = now - WINDOW_PAST, now + WINDOW_FUTURE
+    events = load_events(DOWNLOAD_XLSX_TO, (lo.date(), hi.date()), digest)
+    # Feinschnitt auf die Uhrzeit; ein Cache-Treffer kann außerdem einen größeren Zeitraum enthalten
+    events = [e for e in events if e.end >= lo and e.start <= hi]
     build_ics(events)
     build_html(events)
     print(f"OK: {len(events)} Termine exportiert.")
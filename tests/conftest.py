@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Gemeinsame Helfer: kleine synthetische KW-Workbooks mit openpyxl nach tmp_path schreiben."""
+import datetime as dt
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+DAYS = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag"]
+SLOT = dt.timedelta(minutes=5)
+
+
+def kw_sheet(ws, monday: dt.date, blocks: dict, slots: int = 24, lead: int = 0, header_numbers: bool = False):
+    """Ein KW-Sheet im CIS-Layout: Wochentage, darunter das Datum, dann das 5-Minuten-Raster ab 08:00.
+    blocks: {Tag 0–4: [(erster Slot, Anzahl Slots, Zellwert), ...]}; lead: Spalten vor der Zeitspalte."""
+    pad = [None] * lead
+    ws.append(["Stundenplan"])
+    ws.append(pad + [None] + DAYS)
+    ws.append(pad + [None] + [(monday + dt.timedelta(days=d)).strftime("%d.%m.%Y") for d in range(5)])
+    ws.append(pad + ([2026, 1.5] if header_numbers else []))   # Zahlen im Kopf stören die Datumssuche nicht
+    grid = [[None] * 5 for _ in range(slots)]
+    for d, items in blocks.items():
+        for first, n, value in items:
+            for i in range(first, first + n):
+                grid[i][d] = value
+    t = dt.datetime(2000, 1, 1, 8, 0)
+    for i, row in enumerate(grid):
+        # calamine liefert Zeiten je nach Zellformat als Text oder als datetime.time
+        tv = t.time() if i % 2 else t.strftime("%H:%M")
+        ws.append([f"Notiz {i}"] * lead + [tv] + row)
+        t += SLOT
+    ws.append(["Ende"])
+
+
+@pytest.fixture
+def make_xlsx(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+
+    def make(sheets, name="plan.xlsx"):
+        """sheets: [(Sheetname, Montag, blocks, kw_sheet-Optionen), ...]; None als Montag = Nicht-KW-Sheet."""
+        wb = openpyxl.Workbook()
+        wb.remove(wb.active)
+        for sheet_name, monday, blocks, *opts in sheets:
+            ws = wb.create_sheet(sheet_name)
+            if monday is None: ws.append(["nichts"])
+            else: kw_sheet(ws, monday, blocks, **(opts[0] if opts else {}))
+        path = tmp_path / name
+        wb.save(path)
+        return path
+    return make
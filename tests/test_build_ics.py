@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""build_ics: handgeschriebenes RFC 5545 – Escaping, Falten auf 75 Oktette, CRLF, stabile UIDs."""
+import datetime as dt
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import fetch_and_build as fb  # noqa: E402
+
+
+def ev(title, lecturer="", room="", day=6, h=8):
+    start = dt.datetime(2025, 10, day, h, 0, tzinfo=fb.TZ)
+    return fb.Event(title, lecturer, room, start, start + dt.timedelta(minutes=45))
+
+
+def render(tmp_path, monkeypatch, events) -> bytes:
+    monkeypatch.setattr(fb, "PUBLIC", tmp_path)
+    fb.build_ics(events)
+    return (tmp_path / "stundenplan.ics").read_bytes()
+
+
+def unfolded(data: bytes) -> list[str]:
+    return data.decode("utf-8").replace("\r\n ", "").split("\r\n")
+
+
+def prop(lines, name):
+    return [ln.split(":", 1)[1] for ln in lines if ln.startswith(name + ":")]
+
+
+def test_escaping(tmp_path, monkeypatch):
+    data = render(tmp_path, monkeypatch, [ev(r"Mathe\Statistik; Teil 1, VO", "Huber, Dr.", "A1;B2")])
+    lines = unfolded(data)
+    assert prop(lines, "SUMMARY") == [r"Mathe\\Statistik\; Teil 1\, VO"]
+    assert prop(lines, "LOCATION") == [r"A1\;B2"]
+    # Dozent/Raum stehen zeilenweise in DESCRIPTION -> Zeilenumbruch als \n
+    assert prop(lines, "DESCRIPTION") == [r"Dozent: Huber\, Dr.\nRaum: A1\;B2"]
+
+
+def test_falten_auf_75_oktette_ohne_utf8_zeichen_zu_teilen(tmp_path, monkeypatch):
+    # verschiedene Präfixlängen, damit Ü/ß/€ an jeder Position um die Grenze herum landen
+    titles = ["x" * k + "Übung ß€ " * 12 for k in range(8)] + ["ß" * 100]
+    data = render(tmp_path, monkeypatch, [ev(t, day=6 + i % 5, h=8 + i) for i, t in enumerate(titles)])
+    physical = data.split(b"\r\n")
+    assert any(p.startswith(b" ") for p in physical)   # es wurde tatsächlich gefaltet
+    for p in physical:
+        assert len(p) <= 75
+        p.decode("utf-8")   # wirft, falls ein Mehrbyte-Zeichen zerschnitten wurde
+    assert sorted(prop(unfolded(data), "SUMMARY")) == sorted(fb._ics_escape(t) for t in titles)
+
+
+def test_crlf_zeilenenden(tmp_path, monkeypatch):
+    data = render(tmp_path, monkeypatch, [ev("A", "B", "C"), ev("D" * 200)])
+    assert data.startswith(b"BEGIN:VCALENDAR\r\n") and data.endswith(b"END:VCALENDAR\r\n")
+    assert data.count(b"\n") == data.count(b"\r\n")
+    assert b"\r\r" not in data
+
+
+def test_uids_stabil_ueber_laeufe(tmp_path, monkeypatch):
+    events = [ev("Mathe", "Huber", "A1"), ev("Mathe", "Huber", "A1", h=10), ev("Englisch", day=7)]
+    first = prop(unfolded(render(tmp_path, monkeypatch, events)), "UID")
+    again = prop(unfolded(render(tmp_path, monkeypatch, list(reversed(events)))), "UID")
+    assert len(set(first)) == 3
+    assert first == list(reversed(again))   # gleicher Termin -> gleiche UID, unabhängig von Reihenfolge/DTSTAMP
+    assert all(re.fullmatch(r"[0-9a-f]{40}@stundenplan", u) for u in first)
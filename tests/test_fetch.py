@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Schnellweg: ein 304 nach der Link-Suche per Browser muss das resolved-Datum erneuern."""
+import datetime as dt
+import json
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import fetch_and_build as fb  # noqa: E402
+
+URL = "https://cis.example/cms/dms.php?id=848"
+
+
+def test_304_nach_browser_erneuert_resolved(tmp_path, monkeypatch):
+    today = dt.date.today()
+    stale = (today - fb.LINK_MAX_AGE - dt.timedelta(days=3)).isoformat()
+    xlsx, meta = tmp_path / "latest.xlsx", tmp_path / "xlsx.json"
+    xlsx.write_bytes(b"PK alt")
+    meta.write_text(json.dumps({"url": URL, "resolved": stale, "blake2b": "abc",
+                                "etag": '"v1"', "last_modified": None}), encoding="utf-8")
+    monkeypatch.setattr(fb, "DOWNLOAD_XLSX_TO", xlsx)
+    monkeypatch.setattr(fb, "XLSX_META", meta)
+
+    requests = []
+    def handler(request):
+        requests.append(request)
+        assert request.headers["If-None-Match"] == '"v1"'
+        return httpx.Response(304)
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(fb, "_http", lambda: client)
+
+    browser_runs = []
+    def fake_browser():   # wie fetch_xlsx_via_browser: gleicher Link gefunden, Abruf mit heutigem Datum
+        browser_runs.append(1)
+        return fb._download_xlsx(URL, today.isoformat())
+    monkeypatch.setattr(fb, "fetch_xlsx_via_browser", fake_browser)
+
+    assert fb.fetch_latest_xlsx() is False   # Link zu alt -> Browser -> 304
+    assert browser_runs == [1]
+    stored = json.loads(meta.read_text(encoding="utf-8"))
+    assert stored == {"url": URL, "resolved": today.isoformat(), "blake2b": "abc",
+                      "etag": '"v1"', "last_modified": None}
+
+    assert fb.fetch_latest_xlsx() is False   # nächster Lauf: Schnellweg, kein Browser mehr
+    assert browser_runs == [1]
+    assert len(requests) == 2
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Events-Cache: das Exportfenster wandert täglich weiter, eine unveränderte XLSX darf trotzdem
+nicht jeden Morgen neu geparst werden."""
+import datetime as dt
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import fetch_and_build as fb  # noqa: E402
+
+
+def test_folgetage_treffen_den_cache(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(fb, "CACHE", tmp_path)
+    monkeypatch.setattr(fb, "parse_xlsx_to_events", lambda xlsx, window: calls.append(window) or [])
+    xlsx = tmp_path / "latest.xlsx"
+    xlsx.write_bytes(b"PK alt")
+
+    today = dt.date(2026, 10, 14)
+    for day in range(0, 15):   # zwei Wochen tägliche Läufe, gleicher Inhalt
+        lo = today + dt.timedelta(days=day)
+        fb.load_events(xlsx, (lo - fb.WINDOW_PAST, lo + fb.WINDOW_FUTURE))
+    assert len(calls) == 1
+
+    xlsx.write_bytes(b"PK neue Version")   # neuer Inhalt -> neu parsen
+    fb.load_events(xlsx, (today - fb.WINDOW_PAST, today + fb.WINDOW_FUTURE))
+    assert len(calls) == 2
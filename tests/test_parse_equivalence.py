@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Belegt die „Ausgabe unverändert“-Aussagen der Parser-/Export-Umbauten an erzeugten Workbooks:
+Zeitspalte nicht vorne, Zahlen im Kopf/in Zellen, Zeitfenster, Duplikate über Sheets, Cache, HTML."""
+import datetime as dt
+
+import fetch_and_build as fb
+
+KW12, KW13 = dt.date(2026, 3, 16), dt.date(2026, 3, 23)
+BLOCKS12 = {0: [(0, 9, "Mathe | Huber | A1"), (12, 3, "Englisch")], 4: [(2, 4, "Physik | Maier")]}
+BLOCKS13 = {1: [(0, 6, "Chemie | Gruber | C3")], 3: [(6, 2, "Englisch")]}
+
+
+def rows(events):
+    return [(e.title, e.lecturer, e.room, e.start.isoformat(), e.end.isoformat()) for e in events]
+
+
+def test_zeitspalte_nicht_vorne(make_xlsx):
+    # chunk1-14: Zeitspalte wird unter den ersten 5 Spalten gesucht, Tagesspalten rücken mit
+    plain = make_xlsx([("KW 12", KW12, BLOCKS12)], "plain.xlsx")
+    shifted = make_xlsx([("KW 12", KW12, BLOCKS12, {"lead": 2})], "shifted.xlsx")
+    assert rows(fb.parse_xlsx_to_events(shifted)) == rows(fb.parse_xlsx_to_events(plain))
+    assert len(fb.parse_xlsx_to_events(plain)) == 3
+
+
+def test_zahlen_im_kopf_und_in_zellen(make_xlsx):
+    # chunk1-18: Zahlen im Kopf stören die Datumssuche nicht; ganzzahlige Zellen -> "101"
+    xlsx = make_xlsx([("KW 12", KW12, {0: [(0, 3, 101)], 1: [(0, 3, 101.0)], 2: [(0, 3, 2.5)]},
+                       {"header_numbers": True})])
+    assert [(e.title, e.start.day) for e in fb.parse_xlsx_to_events(xlsx)] == [
+        ("101", 16), ("101", 17), ("2.5", 18)]
+
+
+def test_zeitfenster_gleich_gefilterter_gesamtlauf(make_xlsx):
+    # chunk1-15: Fenster im Parser == vollständiger Lauf, danach nach Datum gefiltert
+    xlsx = make_xlsx([("KW 12", KW12, BLOCKS12), ("KW 13", KW13, BLOCKS13)])
+    full = fb.parse_xlsx_to_events(xlsx)
+    for lo, hi in [(KW12, KW12), (KW12 + dt.timedelta(days=4), KW13 + dt.timedelta(days=1)), (KW13, KW13 + dt.timedelta(days=6))]:
+        expected = [e for e in full if lo <= e.start.date() <= hi]
+        assert fb.parse_xlsx_to_events(xlsx, (lo, hi)) == expected
+        assert expected
+
+
+def test_duplikate_ueber_sheets(make_xlsx):
+    # chunk1-22: Sheets werden einzeln geparst, die Duplikatprüfung läuft übergreifend
+    once = make_xlsx([("KW 12", KW12, BLOCKS12)], "once.xlsx")
+    twice = make_xlsx([("KW 12", KW12, BLOCKS12), ("12", KW12, BLOCKS12)], "twice.xlsx")
+    assert fb.parse_xlsx_to_events(twice) == fb.parse_xlsx_to_events(once)
+
+
+def test_cache_liefert_dieselben_events(make_xlsx, tmp_path, monkeypatch):
+    # chunk2-12: Event-Dataclass übersteht den Pickle-Cache unverändert
+    monkeypatch.setattr(fb, "CACHE", tmp_path)
+    xlsx = make_xlsx([("KW 12", KW12, BLOCKS12), ("KW 13", KW13, BLOCKS13)])
+    window = (KW12, KW13 + dt.timedelta(days=6))
+    parsed = fb.load_events(xlsx, window)
+    monkeypatch.setattr(fb, "parse_xlsx_to_events", lambda *a: (_ for _ in ()).throw(AssertionError("kein Cache")))
+    cached = fb.load_events(xlsx, window)
+    assert cached == parsed and all(isinstance(e, fb.Event) for e in cached)
+
+
+def test_html_tage_und_zeiten(make_xlsx, tmp_path, monkeypatch):
+    # chunk1-11: vorformatierte Tageszeilen/Zeiten entsprechen dem früheren strftime im Template
+    monkeypatch.setattr(fb, "PUBLIC", tmp_path)
+    events = fb.parse_xlsx_to_events(make_xlsx([("KW 12", KW12, BLOCKS12)]))
+    fb.build_html(list(reversed(events)))
+    html = (tmp_path / "index.html").read_text(encoding="utf-8")
+    days = [KW12.strftime("%A, %d.%m.%Y"), (KW12 + dt.timedelta(days=4)).strftime("%A, %d.%m.%Y")]
+    assert html.index(days[0]) < html.index("08:00–08:45 | A1 | Huber") < html.index("09:00–09:15") \
+        < html.index(days[1]) < html.index("08:10–08:30 | Maier")
+    assert html.count('<div class="day">') == 2
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Regressionstests für _parse_sheet: Run-Walk (ein Termin pro Block) und Erkennung des Rasterstarts.
+Die Rohzeilen werden hier erzeugt (so wie calamine sie liefert) – keine Fixture-Datei nötig."""
+import datetime as dt
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import fetch_and_build as fb  # noqa: E402
+
+MO, DI = dt.date(2025, 10, 6), dt.date(2025, 10, 7)
+
+
+def make_rows(blocks, stray=None, grid_start=20, slots=36):
+    """blocks: {Spalte: [(erster Slot, Anzahl Slots, Text), ...]}; Raster ab 08:00 in 5-min-Schritten."""
+    ncols = 3
+    rows = [[""] * ncols for _ in range(grid_start + slots)]
+    rows[0][1:] = ["Montag", "Dienstag"]
+    rows[1][1:] = [MO.strftime("%d.%m.%Y"), DI.strftime("%d.%m.%Y")]
+    if stray:   # einzelne Uhrzeit über dem Raster (z. B. Notizzeile) – darf kein Rasterstart sein
+        r, t, text = stray
+        rows[r][0], rows[r][1] = t, text
+    for i in range(slots):
+        rows[grid_start + i][0] = (dt.datetime(2000, 1, 1, 8) + i * dt.timedelta(minutes=5)).time()
+    for c, items in blocks.items():
+        for first, n, text in items:
+            for i in range(first, first + n):
+                rows[grid_start + i][c] = text
+    return rows
+
+
+def at(day, h, m):
+    return dt.datetime.combine(day, dt.time(h, m), tzinfo=fb.TZ)
+
+
+def test_block_ergibt_genau_einen_termin():
+    # 9 Slots 08:00–08:40 -> ein Termin bis 08:45 (früher zusätzlich ein Rest-Fragment pro Folgezeile)
+    rows = make_rows({1: [(0, 9, "Mathe | Huber | A1")]})
+    assert fb._parse_sheet(rows, None) == [("Mathe", "Huber", "A1", at(MO, 8, 0), at(MO, 8, 45))]
+
+
+def test_unterbrochene_bloecke_und_mehrere_tage():
+    rows = make_rows({1: [(0, 3, "Englisch"), (6, 3, "Englisch")],
+                      2: [(12, 6, "Physik | Maier")]})
+    assert fb._parse_sheet(rows, None) == [
+        ("Englisch", "", "", at(MO, 8, 0), at(MO, 8, 15)),
+        ("Englisch", "", "", at(MO, 8, 30), at(MO, 8, 45)),
+        ("Physik", "Maier", "", at(DI, 9, 0), at(DI, 9, 30)),
+    ]
+
+
+def test_einzelne_uhrzeit_vor_dem_raster_wird_ignoriert():
+    rows = make_rows({1: [(0, 2, "Chemie")]}, stray=(5, "07:00", "Notiz"))
+    assert fb._parse_sheet(rows, None) == [("Chemie", "", "", at(MO, 8, 0), at(MO, 8, 10))]
+
+
+def test_zeitfenster_filtert_tagesspalten():
+    rows = make_rows({1: [(0, 2, "Mo")], 2: [(0, 2, "Di")]})
+    assert [k[0] for k in fb._parse_sheet(rows, (DI, DI))] == ["Di"]
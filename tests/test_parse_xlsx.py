@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""End-to-End: mit openpyxl geschriebenes Workbook -> parse_xlsx_to_events (calamine, Raster, Run-Walk, TZ)."""
+import datetime as dt
+
+import fetch_and_build as fb
+
+KW12, KW14 = dt.date(2026, 3, 16), dt.date(2026, 3, 30)   # vor / nach der Sommerzeit-Umstellung (29.03.)
+
+
+def rows(events):
+    return [(e.title, e.lecturer, e.room, e.start.isoformat(), e.end.isoformat()) for e in events]
+
+
+def test_bloecke_mit_zeitzonen_offsets(make_xlsx):
+    xlsx = make_xlsx([
+        ("Info", None, {}),
+        ("KW 14", KW14, {1: [(6, 6, "Programmieren | X | Lab")]}),
+        ("KW 12", KW12, {0: [(0, 9, "Mathe | Huber | A1"), (12, 3, "Englisch")],
+                         2: [(0, 2, "Physik\nMaier\nB2")]}),
+    ])
+    assert rows(fb.parse_xlsx_to_events(xlsx)) == [
+        ("Mathe", "Huber", "A1", "2026-03-16T08:00:00+01:00", "2026-03-16T08:45:00+01:00"),
+        ("Englisch", "", "", "2026-03-16T09:00:00+01:00", "2026-03-16T09:15:00+01:00"),
+        ("Physik", "Maier", "B2", "2026-03-18T08:00:00+01:00", "2026-03-18T08:10:00+01:00"),
+        ("Programmieren", "X", "Lab", "2026-03-31T08:30:00+02:00", "2026-03-31T09:00:00+02:00"),
+    ]
+    assert all(e.start.tzinfo is fb.TZ for e in fb.parse_xlsx_to_events(xlsx))